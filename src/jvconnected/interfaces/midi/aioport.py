@@ -178,6 +178,10 @@ class InputPort(BasePort):
             return True
         result = True
         async with self._item_ready:
+            # A message may have been queued while waiting for the lock and
+            # its notify would be missed here
+            if not self.queue.empty():
+                return True
             if timeout is None:
                 await self._item_ready.wait()
             else:
@@ -279,9 +283,8 @@ class OutputPort(BasePort):
             msg: The :class:`mido.Message` to send
 
         """
-        def _enqueue():
-            self.queue.put(msg)
-        await self.loop.run_in_executor(None, _enqueue)
+        # The queue is unbounded so this never blocks
+        self.queue.put_nowait(msg)
 
     async def send_many(self, *msgs):
         """Send multiple messages
@@ -293,10 +296,9 @@ class OutputPort(BasePort):
             *msgs: The :class:`Messages <mido.Message>` to send
 
         """
-        def _enqueue():
-            for msg in msgs:
-                self.queue.put(msg)
-        await self.loop.run_in_executor(None, _enqueue)
+        put = self.queue.put_nowait
+        for msg in msgs:
+            put(msg)
 
     async def _build_port(self) -> mido.ports.BaseOutput:
         port = None
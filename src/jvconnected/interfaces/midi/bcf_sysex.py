@@ -1,28 +1,28 @@
 # https://mountainutilities.eu/system/files/download/BC-MIDI-Implementation-1.2.9.pdf
 
 from loguru import logger
-from typing import List, Sequence, ByteString, ClassVar, Tuple, Dict, Optional
-import dataclasses
+from typing import List, Sequence, ClassVar, Tuple, Dict, Optional, Any
+import itertools
+import struct
 from dataclasses import dataclass, field
 
 import mido
 
+from jvconnected.utils import FlatDataclassMixin
 from . import aioport
 
-MidiString = Sequence[ByteString]
-
 
 def byte_split(i: int) -> Tuple[int, int]:
-    lsb = i & 0x7f
-    msb = i >> 7
-    return tuple([msb, lsb])
+    return ((i >> 7) & 0x7f, i & 0x7f)
+
 
-def byte_unsplit(msb: int, lsb: int) -> int:
-    return (msb << 7) | lsb
+_BCL_BOOL = ('off', 'on')
 
+# manufacturer, device_id, model, command, index_msb, index_lsb
+_HEADER_STRUCT = struct.Struct('>3scccBB')
 
 def bool_to_bcl(value: bool) -> str:
-    return {True:'on', False:'off'}[value]
+    return _BCL_BOOL[value]
 
 ERROR_CODES = {
     0: ('noerr', 'No error'),
@@ -71,26 +71,26 @@ class ResponseError(Exception):
         msg_code, msg_desc = ERROR_CODES[self.error_code]
         return f'Error {self.error_code}: "{msg_desc}" ({msg_code})'
 
-@dataclass
+@dataclass(frozen=True)
 class BCLSyxBase:
     """Wrapper for a single BCL command as a Sysex message
     """
 
-    manufacturer: MidiString = (0x00, 0x20, 0x32)
+    manufacturer: bytes = b'\x00\x20\x32'
     """The Sysex manufacturer id
 
-    This should always be ``(0x00, 0x20, 0x32)`` (Behringer)
+    This should always be ``b'\\x00\\x20\\x32'`` (Behringer)
     """
 
-    device_id: MidiString = (0x7f,)
+    device_id: bytes = b'\x7f'
     """The device id from 0x00 to 0x15, or 0x7f for "any"
     """
 
-    model: MidiString = (0x14,) # for BCF2000, `0x15` is BCR2000
+    model: bytes = b'\x14' # for BCF2000, `0x15` is BCR2000
     """0x14 for BCF2000, 0x15 for BCR2000, or 0x7f for "any"
     """
 
-    command: MidiString = (0x20,)
+    command: bytes = b'\x20'
     """The command type. This is 0x20 for BCL messages
     """
 
@@ -98,53 +98,63 @@ class BCLSyxBase:
     """Index of the BCL command within a :class:`BCLBlock`
     """
 
-    msg_attrs: ClassVar[Sequence[str]] = (
+    header_attrs: ClassVar[Sequence[str]] = (
         'manufacturer', 'device_id', 'model', 'command',
-        'index_msb', 'index_lsb',
     )
 
+    payload_attr: ClassVar[Optional[str]] = None
+    """Name of the field (if any) stored in the sysex data following the
+    message index
+    """
+
+    _header_defaults: ClassVar[Tuple[bytes, ...]]
+    _header_bytes: ClassVar[bytes]
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._build_header_bytes()
+
+    @classmethod
+    def _build_header_bytes(cls):
+        # The header fields rarely differ from the class defaults, so their
+        # joined bytes are computed once here instead of on every build
+        cls._header_defaults = tuple(getattr(cls, attr) for attr in cls.header_attrs)
+        cls._header_bytes = b''.join(cls._header_defaults)
+
     @classmethod
     def from_sysex_message(cls, msg: mido.Message) -> 'BCLSysex':
         """Create an instance from the given :class:`~mido.Message`
         """
-        kw = cls._parse_kwargs_from_sysex(msg)
-        return cls(**kw)
+        return cls(*cls._parse_args_from_sysex(msg))
 
     @classmethod
-    def _parse_kwargs_from_sysex(cls, msg: mido.Message) -> Dict:
-        data = msg.data
-        kw = dict(
-            manufacturer=data[:3],
-            device_id=data[3:4],
-            model=data[4:5],
-            command=data[5:6],
-            message_index=byte_unsplit(data[6], data[7]),
-        )
-        return kw
+    def _parse_args_from_sysex(cls, msg: mido.Message) -> Tuple:
+        # Arguments are in field order: the header fields, message_index
+        # and the payload field (if any)
+        data = bytes(msg.data)
+        mfr, device_id, model, command, ix_msb, ix_lsb = _HEADER_STRUCT.unpack_from(data)
+        args = (mfr, device_id, model, command, (ix_msb << 7) | ix_lsb)
+        if cls.payload_attr is not None:
+            args += (cls._parse_payload(data[_HEADER_STRUCT.size:]),)
+        return args
 
-    @property
-    def index_msb(self) -> MidiString:
-        """Bits 7-13 of :attr:`message_index`
-        """
-        return byte_split(self.message_index)[0:1]
-
-    @property
-    def index_lsb(self) -> MidiString:
-        """Bits 0-6 of :attr:`message_index`
-        """
-        return byte_split(self.message_index)[1:2]
+    @classmethod
+    def _parse_payload(cls, payload: bytes) -> Any:
+        raise NotImplementedError
 
-    def build_sysex_data(self) -> MidiString:
-        """Build the Sysex message as a sequence of int
+    def build_sysex_data(self) -> bytes:
+        """Build the Sysex message data as :class:`bytes`
         """
-        msg = []
-        for attr in self.msg_attrs:
-            val = self._field_to_syx_list(attr)
-            msg.extend(val)
-        return msg
+        header = (self.manufacturer, self.device_id, self.model, self.command)
+        if header == self._header_defaults:
+            header = self._header_bytes
+        else:
+            header = b''.join(header)
+        ix = self.message_index
+        return header + bytes(((ix >> 7) & 0x7f, ix & 0x7f)) + self._payload_bytes()
 
-    def _field_to_syx_list(self, attr: str) -> List[ByteString]:
-        return list(getattr(self, attr))
+    def _payload_bytes(self) -> bytes:
+        return b''
 
     def build_sysex_message(self) -> mido.Message:
         """Build a Sysex message wrapped in a :class:`mido.Message`
@@ -152,7 +162,9 @@ class BCLSyxBase:
         data = self.build_sysex_data()
         return mido.Message('sysex', data=data)
 
-@dataclass
+BCLSyxBase._build_header_bytes()
+
+@dataclass(frozen=True)
 class BCLSysex(BCLSyxBase):
     """A BCL Text command
     """
@@ -161,45 +173,36 @@ class BCLSysex(BCLSyxBase):
     """The BCL line
     """
 
-    msg_attrs: ClassVar[Sequence[str]] = (
-        'manufacturer', 'device_id', 'model', 'command',
-        'index_msb', 'index_lsb', 'bcl_text',
-    )
+    payload_attr: ClassVar[Optional[str]] = 'bcl_text'
 
     @classmethod
-    def _parse_kwargs_from_sysex(cls, msg: mido.Message) -> Dict:
-        kw = super()._parse_kwargs_from_sysex(msg)
-        data = msg.data
-        kw['bcl_text'] = bytearray(data[8:]).decode('UTF-8')
-        return kw
-
-    def _field_to_syx_list(self, attr: str) -> List[ByteString]:
-        if attr == 'bcl_text':
-            val = list(bytearray(self.bcl_text, 'UTF-8'))
-        else:
-            val = list(getattr(self, attr))
-        return val
+    def _parse_payload(cls, payload: bytes) -> str:
+        return payload.decode('UTF-8')
 
-@dataclass
+    def _payload_bytes(self) -> bytes:
+        return self.bcl_text.encode('UTF-8')
+
+@dataclass(frozen=True)
 class BCLReply(BCLSyxBase):
     """A message sent from a BC device in response to a BCL command
     """
 
-    error_code: MidiString = (0,)
+    command: bytes = b'\x21'
+    """The command type. This is 0x21 for BCL replies
+    """
+
+    error_code: int = 0
     """If non-zero, indicates an error occured
     """
 
-    msg_attrs: ClassVar[Sequence[str]] = (
-        'manufacturer', 'device_id', 'model', 'command',
-        'index_msb', 'index_lsb', 'error_code',
-    )
+    payload_attr: ClassVar[Optional[str]] = 'error_code'
 
     @classmethod
-    def _parse_kwargs_from_sysex(cls, msg: mido.Message) -> Dict:
-        kw = super()._parse_kwargs_from_sysex(msg)
-        data = msg.data
-        kw['error_code'] = data[8]
-        return kw
+    def _parse_payload(cls, payload: bytes) -> int:
+        return payload[0]
+
+    def _payload_bytes(self) -> bytes:
+        return bytes([self.error_code])
 
     def raise_on_error(self):
         """Check for errors and raise a :class:`ResponseError` if necessary
@@ -237,73 +240,94 @@ class BCLBlock:
             The messages remaining after parsing
 
         """
-        # items = []
         kw = {'text_lines':[]}
-
+        text_lines = kw['text_lines']
         unhandled = []
-        messages = list(messages)
-
-        bcl_ix = 0
-        msg_ix = 0
-        start_item = None
-        end_item = None
-        for msg_ix, msg in enumerate(messages):
-            if msg.type != 'sysex':
+
+        # States: before the "$rev" line, within the block and after "$end"
+        seek_rev, in_body, done = 0, 1, 2
+        state = seek_rev
+        expected_ix = 0
+        header = BCLSysex._header_bytes
+        for msg in messages:
+            if state == done or msg.type != 'sysex':
+                unhandled.append(msg)
+                continue
+            data = msg.data
+            # Skip anything other than BCL commands (ignoring the device id),
+            # including replies and sysex from other devices
+            msg_header = bytes(data[:6])
+            if len(data) < 8 or msg_header[:3] != header[:3] or msg_header[4:] != header[4:]:
                 unhandled.append(msg)
                 continue
-            item = BCLSysex.from_sysex_message(msg)
-            if start_item is None:
-                if item.bcl_text.startswith('$rev'):
-                    start_item = item
-                    msg_ix = item.message_index
-                    kw['revision'] = item.bcl_text.split('$rev')[1].strip(' ')
-                else:
+            # Check the command prefix on the raw data so only the lines
+            # that are kept need to be decoded
+            prefix = bytes(data[8:12])
+            if state == seek_rev:
+                if prefix != b'$rev':
                     unhandled.append(msg)
+                    continue
+                item = BCLSysex.from_sysex_message(msg)
+                kw['revision'] = item.bcl_text[4:].strip(' ')
+                expected_ix = item.message_index + 1
+                state = in_body
                 continue
-            elif end_item is not None:
-                msg_ix += 1
-                if item.message_index != msg_ix:
-                    raise Exception('wrong message index')
-                if item.bcl_text.startswith('$end'):
-                    end_item = item
-                else:
-                    kw['text_lines'].append(item.bcl_text)
+            msg_ix = (data[6] << 7) | data[7]
+            if msg_ix != expected_ix:
+                raise ValueError('wrong message index')
+            expected_ix += 1
+            if prefix == b'$end':
+                state = done
             else:
-                unhandled.append(msg)
-
-            # # assert item.message_index == i
-            # # items.append(item)
-            # if item.bcl_text.startswith('$rev'):
-            #     kw['revision'] = item.bcl_text.split('$rev')[1].strip(' ')
-            # elif item.bcl_text.startswith('$end'):
-            #     break
-            # kw['text_lines'].append(item.bcl_text)
+                text_lines.append(bytes(data[8:]).decode('UTF-8'))
         blk = cls(**kw)
         return tuple([blk, unhandled])
 
-    def build_sysex_items(self) -> Sequence[BCLSysex]:
-        """Construct the :class:`BCLSysex` items needed to send the block
+    def get_all_lines(self) -> List[str]:
+        """Get the :attr:`text_lines` including the block start and end commands
         """
         all_lines = [f'$rev {self.revision}']
-        all_lines.extend(list(self.text_lines))
+        all_lines.extend(self.text_lines)
         all_lines.append('$end')
-        items = []
-        for i, line in enumerate(all_lines):
-            # items.append(BCLSysex(message_index=i, bcl_text=line))
-            item = BCLSysex(message_index=i, bcl_text=line)
-            parsed = BCLSysex.from_sysex_message(item.build_sysex_message())
-            assert item == parsed
-            assert item.message_index == parsed.message_index
-            assert item.index_msb == parsed.index_msb
-            assert item.index_lsb == parsed.index_lsb
-            items.append(item)
-        return items
+        return all_lines
+
+    def build_sysex_items(self) -> Sequence[BCLSysex]:
+        """Construct the :class:`BCLSysex` items needed to send the block
+        """
+        return [
+            BCLSysex(message_index=i, bcl_text=line)
+            for i, line in enumerate(self.get_all_lines())
+        ]
+
+    def build_sysex_data(self) -> List[bytes]:
+        """Build the Sysex data for each line in the block as :class:`bytes`
+
+        The result matches :meth:`BCLSyxBase.build_sysex_data` for each of the
+        :meth:`build_sysex_items`, without creating the items
+        """
+        all_lines = self.get_all_lines()
+        header = BCLSysex._header_bytes
+        index_bytes = bytes(itertools.chain.from_iterable(
+            byte_split(i) for i in range(len(all_lines))
+        ))
+        return [
+            header + index_bytes[i*2:i*2+2] + line.encode('UTF-8')
+            for i, line in enumerate(all_lines)
+        ]
 
     def build_sysex_messages(self) -> Sequence[mido.Message]:
         """Build the block as a sequence of Sysex :class:`Messages <mido.Message>`
         """
-        items = self.build_sysex_items()
-        return [item.build_sysex_message() for item in items]
+        return [mido.Message('sysex', data=data) for data in self.build_sysex_data()]
+
+    def build_sysex_bytes(self) -> List[bytes]:
+        """Build the block as a sequence of complete Sysex frames
+        (including the ``0xF0`` and ``0xF7`` status bytes)
+
+        This is equivalent to calling :meth:`mido.Message.bin` on each of the
+        :meth:`build_sysex_messages` without creating the message objects
+        """
+        return [b''.join((b'\xf0', data, b'\xf7')) for data in self.build_sysex_data()]
 
     @logger.catch
     async def send(self, inport: aioport.InputPort, outport: aioport.OutputPort):
@@ -350,8 +374,8 @@ class BCLBlock:
             await ioport.close()
 
 
-@dataclass
-class ControlBase:
+@dataclass(frozen=True)
+class ControlBase(FlatDataclassMixin):
     """Base class for control definitions
     """
 
@@ -399,7 +423,7 @@ class ControlBase:
 
     def __post_init__(self):
         if self.is_14_bit and self.value_max == 127:
-            self.value_max = 16383
+            object.__setattr__(self, 'value_max', 16383)
 
     @property
     def is_14_bit(self) -> bool:
@@ -435,7 +459,7 @@ class ControlBase:
         return lines
 
 
-@dataclass
+@dataclass(frozen=True)
 class EncoderConf(ControlBase):
     """A Push Encoder configuration
     """
@@ -477,6 +501,12 @@ class EncoderConf(ControlBase):
 
     bcl_command: ClassVar[str] = '$encoder'
 
+    def __post_init__(self):
+        super().__post_init__()
+        # Instances are frozen so the resolution can be formatted once
+        resolution = ' '.join([str(i) for i in self.resolution])
+        object.__setattr__(self, '_resolution_str', resolution)
+
     def _get_is_14_bit(self) -> bool:
         return self.encoder_mode.endswith('/14')
 
@@ -486,12 +516,11 @@ class EncoderConf(ControlBase):
 
     def build_bcl_lines(self) -> Sequence[str]:
         lines = super().build_bcl_lines()
-        resolution = ' '.join([str(i) for i in self.resolution])
-        lines.append(f'  .resolution {resolution}')
+        lines.append(f'  .resolution {self._resolution_str}')
         return lines
 
 
-@dataclass
+@dataclass(frozen=True)
 class FaderConf(ControlBase):
     """A fader configuration
     """
@@ -550,7 +579,7 @@ class FaderConf(ControlBase):
         return lines
 
 
-@dataclass
+@dataclass(frozen=True)
 class ButtonConf(ControlBase):
     """A Button configuration
     """
@@ -578,16 +607,15 @@ class ButtonConf(ControlBase):
     bcl_command: ClassVar[str] = '$button'
 
     def get_easyparams(self) -> str:
-        params = super().get_easyparams().split(' ')[:2]
-        # params = [self.channel + 1, self.number]
+        ch = self.channel + 1
         if self.message_type == 'note':
-            params.extend([self.value_max, self.button_mode])
+            s = f'{ch} {self.number} {self.value_max} {self.button_mode}'
         else:
-            params.extend([self.value_min, self.value_max, self.button_mode])
+            s = f'{ch} {self.number} {self.value_min} {self.value_max} {self.button_mode}'
 
         if self.mode == 'increment':
-            params.append(self.increment)
-        return ' '.join([str(p) for p in params])
+            s = f'{s} {self.increment}'
+        return s
 
 class Preset:
     """Representation of a BCF preset containing :attr:`encoders`, :attr:`faders`
@@ -624,14 +652,20 @@ class Preset:
     """Mapping of :class:`ButtonConf` definitions using their index as keys
     """
 
+    setting_keys: ClassVar[Tuple[str, ...]] = (
+        'name', 'snapshot', 'request', 'egroups', 'fkeys', 'lock',
+    )
+
     def __init__(self, **kwargs):
-        keys = ['name', 'snapshot', 'request', 'egroups', 'fkeys', 'lock']
-        for key in keys:
+        for key in self.setting_keys:
             kwargs.setdefault(key, getattr(self, key))
             setattr(self, key, kwargs[key])
         self.encoders = {}
         self.faders = {}
         self.buttons = {}
+        self._cache_settings = None
+        self._cached_lines = None
+        self._cached_messages = None
 
         for kw in kwargs.get('encoders', []):
             self.add_encoder(**kw)
@@ -651,6 +685,7 @@ class Preset:
         if obj.index in self.encoders:
             raise KeyError(f'Encoder {obj.index} already exists')
         self.encoders[obj.index] = obj
+        self._invalidate_cache()
         return obj
 
     def add_fader(self, **kwargs) -> FaderConf:
@@ -662,6 +697,7 @@ class Preset:
         if obj.index in self.faders:
             raise KeyError(f'Fader {obj.index} already exists')
         self.faders[obj.index] = obj
+        self._invalidate_cache()
         return obj
 
     def add_button(self, **kwargs) -> ButtonConf:
@@ -673,30 +709,49 @@ class Preset:
         if obj.index in self.buttons:
             raise KeyError(f'Button {obj.index} already exists')
         self.buttons[obj.index] = obj
+        self._invalidate_cache()
         return obj
 
+    def _invalidate_cache(self):
+        self._cache_settings = None
+        self._cached_lines = None
+        self._cached_messages = None
+
+    def _check_cache(self):
+        # The controls are frozen, so comparing the dict items also catches
+        # any that were replaced or removed without going through add_*()
+        settings = (
+            tuple(getattr(self, key) for key in self.setting_keys),
+            tuple(self.encoders.items()),
+            tuple(self.faders.items()),
+            tuple(self.buttons.items()),
+        )
+        if settings != self._cache_settings:
+            self._invalidate_cache()
+            self._cache_settings = settings
+
     def as_dict(self) -> Dict:
-        keys = ['name', 'snapshot', 'request', 'egroups', 'fkeys', 'lock']
-        d = {key:getattr(self, key) for key in keys}
-        d.update({'encoders':[], 'faders':[], 'buttons':[]})
-
-        for obj in self.encoders.values():
-            d['encoders'].append(dataclasses.asdict(obj))
-        for obj in self.faders.values():
-            d['faders'].append(dataclasses.asdict(obj))
-        for obj in self.buttons.values():
-            d['buttons'].append(dataclasses.asdict(obj))
+        d = {key:getattr(self, key) for key in self.setting_keys}
+        d['encoders'] = [obj.as_dict() for obj in self.encoders.values()]
+        d['faders'] = [obj.as_dict() for obj in self.faders.values()]
+        d['buttons'] = [obj.as_dict() for obj in self.buttons.values()]
         return d
 
     def build_bcl_lines(self) -> Sequence[str]:
         """Build the BCL commands for the preset as a list of strings
+
+        The result is cached until any of the controls or preset settings
+        are changed
         """
-        name = self.name
-        if len(name) < 24:
-            nfill = 24 - len(name)
-            name = ''.join([name, ' '*nfill])
-        elif len(name) > 24:
+        self._check_cache()
+        if self._cached_lines is None:
+            self._cached_lines = tuple(self._build_bcl_lines())
+        return list(self._cached_lines)
+
+    def _build_bcl_lines(self) -> Sequence[str]:
+        if len(self.name) > 24:
             raise ValueError('name must be 24 characters or less')
+        name = self.name.ljust(24)
 
         lines = [
             '$preset',
@@ -708,15 +763,12 @@ class Preset:
             '  .lock {}'.format(bool_to_bcl(self.lock)),
             '  .init',
         ]
-        for obj in self.encoders.values():
-            lines.extend(obj.build_bcl_lines())
-
-        for obj in self.faders.values():
-            lines.extend(obj.build_bcl_lines())
-
-        for obj in self.buttons.values():
-            lines.extend(obj.build_bcl_lines())
-
+        controls = itertools.chain(
+            self.encoders.values(), self.faders.values(), self.buttons.values(),
+        )
+        lines.extend(itertools.chain.from_iterable(
+            obj.build_bcl_lines() for obj in controls
+        ))
         return lines
 
     def build_bcl_block(self) -> BCLBlock:
@@ -727,9 +779,22 @@ class Preset:
 
     def build_sysex_messages(self) -> Sequence[mido.Message]:
         """Build the BCL commands for the preset as a sequence of Sysex messages
+
+        The messages are cached as described in :meth:`build_bcl_lines` and
+        copies of them are returned
+        """
+        self._check_cache()
+        if self._cached_messages is None:
+            blk = self.build_bcl_block()
+            self._cached_messages = tuple(blk.build_sysex_messages())
+        return [msg.copy() for msg in self._cached_messages]
+
+    def build_sysex_bytes(self) -> List[bytes]:
+        """Build the BCL commands for the preset as a sequence of complete
+        Sysex frames using :meth:`BCLBlock.build_sysex_bytes`
         """
         blk = self.build_bcl_block()
-        return blk.build_sysex_messages()
+        return blk.build_sysex_bytes()
 
     def build_store_block(self, preset_num: int) -> BCLBlock:
         """Build the BCL commands to store the preset to the given number, wrapped
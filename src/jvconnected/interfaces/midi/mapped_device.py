@@ -1,16 +1,36 @@
 from loguru import logger
 import asyncio
 from numbers import Number
-from typing import Union, Dict, Any, List, Iterable, Sequence
+from typing import Union, Dict, Any, List, Tuple, Iterable, Sequence, Optional, ClassVar
 
 import mido
 from pydispatch import Dispatcher, Property, DictProperty
 
-from jvconnected.interfaces.paramspec import ParameterGroupSpec, ParameterSpec, BaseParameterSpec
+from jvconnected.interfaces.paramspec import (
+    ParameterGroupSpec, ParameterSpec, BaseParameterSpec, BoolValue,
+)
 from .mapper import Map
 
 NumOrBool = Union[Number, bool]
 
+DispatchKey = Tuple[str, int, int]
+"""A tuple of ``(msg_type, channel, number)`` used to route incoming messages,
+where ``number`` is either the controller or note number
+"""
+
+def get_message_dispatch_key(msg: mido.messages.BaseMessage) -> Optional[DispatchKey]:
+    """Get the :data:`DispatchKey` for the given message
+
+    If the message type is not one handled by :class:`MappedParameter`,
+    ``None`` is returned
+    """
+    msg_type = msg.type
+    if msg_type == 'control_change':
+        return (msg_type, msg.channel, msg.control)
+    elif msg_type == 'note_on' or msg_type == 'note_off':
+        return (msg_type, msg.channel, msg.note)
+    return None
+
 class MappedDevice(Dispatcher):
     """Manages midi input and output for a single :class:`~jvconnected.device.Device`
 
@@ -22,6 +42,7 @@ class MappedDevice(Dispatcher):
     Attributes:
         param_specs (Dict[str, ParameterGroupSpec]): A dict of
             :class:`jvconnected.interfaces.paramspec.ParameterGroupSpec` instances
+            for the groups with at least one mapping in the :attr:`mapper`
         mapped_params (Dict[str, MappedParameter]): A dict of :class:`MappedParameter`
             instances stored with the :attr:`MappedParameter.name` as keys
 
@@ -36,54 +57,70 @@ class MappedDevice(Dispatcher):
         self.midi_io = midi_io
         self.midi_channel = midi_channel
         self.device = device
-        self.param_specs = {}
-        self.mapped_params = {}
         self.mapper = mapper
+        param_specs = {}
+        mapped_params = {}
+        dispatch_map = {}
         for cls in ParameterGroupSpec.all_parameter_group_cls():
+            group_maps = mapper.map_grouped.get(cls.name)
+            if not group_maps:
+                continue
             pg = cls(device=device)
-            self.param_specs[pg.name] = pg
+            param_specs[pg.name] = pg
             for param_spec in pg.parameter_list:
-                if param_spec.full_name in self.mapper:
-                    m = self.mapper[param_spec.full_name]
-                    mp_cls = CONTROLLER_CLS[m.map_type]
-                    kw = {}
-                    if mp_cls is MappedNoteParam:
-                        kw['note'] = m.note
-                    else:
-                        kw['controller'] = m.controller
-                    mapped_param = mp_cls(self, param_spec, m, **kw)
-                    self.mapped_params[mapped_param.name] = mapped_param
-
+                m = group_maps.get(param_spec.name)
+                if m is None:
+                    continue
+                mapped_param = CONTROLLER_CLS[m.map_type].from_map_obj(self, param_spec, m)
+                mapped_params[mapped_param.name] = mapped_param
+                for key in mapped_param.get_dispatch_keys():
+                    dispatch_map.setdefault(key, []).append(mapped_param)
+        self.param_specs = param_specs
+        self.mapped_params = mapped_params
+        self._dispatch_map = dispatch_map
 
     async def handle_incoming_messages(self, msgs: Iterable[mido.Message]):
         """Dispatch incoming messages to all :class:`MappedParameter` instances
 
-        The :meth:`MappedParameter.handle_incoming_messages` method is called for
-        each parameter instance in :attr:`mapped_params`
+        Each message is routed by its :data:`DispatchKey` to the matching
+        parameter instances in :attr:`mapped_params`. Only the parameters
+        with matching messages are called, one after another, with the
+        messages already validated by the routing.
         """
-        coros = set()
-        for mapped_param in self.mapped_params.values():
-            coros.add(mapped_param.handle_incoming_messages(msgs))
-        try:
-            await asyncio.gather(*coros)
-        except Exception as exc:
-            logger.exception(exc)
+        dispatch_map = self._dispatch_map
+        matched = {}
+        for msg in msgs:
+            key = get_message_dispatch_key(msg)
+            if key is None:
+                continue
+            for mapped_param in dispatch_map.get(key, ()):
+                if mapped_param in matched:
+                    matched[mapped_param].append(msg)
+                else:
+                    matched[mapped_param] = [msg]
+        # Device commands are queued by the param groups, so awaiting each
+        # handler in turn does not wait on any network I/O
+        for mapped_param, param_msgs in matched.items():
+            try:
+                await mapped_param._handle_dispatched_messages(param_msgs)
+            except Exception as exc:
+                logger.exception(exc)
 
     @logger.catch
     async def send_all_parameters(self):
         """Send values for all mapped parameters (full refresh)
         """
+        await self.send_messages(self.get_all_parameter_messages())
+
+    def get_all_parameter_messages(self) -> List[mido.Message]:
+        """Build messages for the current values of all mapped parameters
+
+        Used by :meth:`send_all_parameters`
+        """
         msgs = []
         for mapped_param in self.mapped_params.values():
-            value = mapped_param.get_current_value()
-            if value is None:
-                continue
-            msg = mapped_param.build_message(value)
-            if isinstance(msg, (list, tuple)):
-                msgs.extend(list(msg))
-            else:
-                msgs.append(msg)
-        await self.send_messages(msgs)
+            msgs += mapped_param.build_current_messages()
+        return msgs
 
     async def send_message(self, msg: mido.Message):
         """Send the given message with :attr:`midi_io`
@@ -96,10 +133,13 @@ class MappedDevice(Dispatcher):
         await self.midi_io.send_messages(msgs)
 
 
-class MappedParameter(Dispatcher):
+class MappedParameter:
     """Handles midi input and output for a single parameter within a
     :class:`jvconnected.device.ParameterGroup`
 
+    Instances use :obj:`__slots__`, so subclasses adding attributes must
+    declare them in their own :obj:`__slots__`
+
     Attributes:
         mapped_device (:class:`MappedDevice`): The parent :class:`MappedDevice` instance
         param_group (ParameterGroupSpec): The :class:`~.paramspec.ParameterGroupSpec`
@@ -110,19 +150,31 @@ class MappedParameter(Dispatcher):
         param_spec: The :class:`~.paramspec.ParameterSpec` instance within the
             :attr:`param_group`
         channel (int): The midi channel to use, typically gathered from :attr:`mapped_device`
+        value_min (int): Minimum value for the parameter as it exists in the
+            :class:`jvconnected.device.ParameterGroup`. Defaults to ``0``
+        value_max (int): Maximum value for the parameter as it exists in the
+            :class:`jvconnected.device.ParameterGroup`. Defaults to ``1``
+        value_range (int): Total range of values calculated as
+            :attr:`value_max` - :attr:`value_min`, plus one if :attr:`value_min`
+            is zero
+        is_14_bit (bool): True if the :attr:`map_obj` uses 14 bit values
+        midi_max (int): Maximum value for MIDI data. Will be 127 (``0x7f``)
+            in most cases.  If :attr:`is_14_bit`, the value will be
+            16383 (``0x3fff``).
+        midi_range (int): Total range of MIDI values calculated as
+            :attr:`midi_max` + 1
 
     """
-    name = None
-    channel = 0
-    value_min: int = 0
-    """Minimum value for the parameter as it exists in the
-    :class:`jvconnected.device.ParameterGroup`
-    """
+    __slots__ = (
+        'mapped_device', 'param_group', 'param_spec', 'name', 'map_obj',
+        'channel', 'value_min', 'value_max', 'value_range', 'is_14_bit',
+        'midi_max', 'midi_range', '_is_bool',
+        '_from_midi_scale', '_from_midi_lut', '_last_midi_value',
+        '_to_midi_cache', '__weakref__',
+    )
 
-    value_max: int = 1
-    """Maximum value for the parameter as it exists in the
-    :class:`jvconnected.device.ParameterGroup`
-    """
+    TO_MIDI_CACHE_SIZE: ClassVar[int] = 64
+    """Maximum number of results kept by :meth:`scale_to_midi`"""
 
     def __init__(self, mapped_device: MappedDevice, param_spec: BaseParameterSpec, map_obj: Map, **kwargs):
         self.mapped_device = mapped_device
@@ -131,60 +183,73 @@ class MappedParameter(Dispatcher):
         self.param_spec = param_spec
         self.name = self.param_spec.full_name
         self.map_obj = map_obj
-        self.channel = kwargs.get('channel', mapped_device.midi_channel)
-        if hasattr(self.param_spec.value_type, 'value_min'):
-            self.value_min = self.param_spec.value_type.value_min
-            self.value_max = self.param_spec.value_type.value_max
+        if 'channel' in kwargs:
+            self.channel = kwargs['channel']
+        else:
+            self.channel = mapped_device.midi_channel
+        value_type = param_spec.value_type
+        value_min = getattr(value_type, 'value_min', None)
+        if value_min is not None:
+            self.value_min = value_min
+            self.value_max = value_type.value_max
+        else:
+            self.value_min = 0
+            self.value_max = 1
+        value_range = self.value_max - self.value_min
+        if self.value_min == 0:
+            value_range += 1
+        self.value_range = value_range
+        self.is_14_bit = map_obj.is_14_bit
+        self.midi_max = 16383 if self.is_14_bit else 0x7f
+        self.midi_range = self.midi_max + 1
+        self._is_bool = isinstance(value_type, BoolValue)
+        self._from_midi_scale = self.value_range / self.midi_range
+        if self.is_14_bit:
+            self._from_midi_lut = None
+        else:
+            self._from_midi_lut = tuple(
+                self._scale_from_midi(value) for value in range(self.midi_range)
+            )
+        self._last_midi_value = None
+        self._to_midi_cache = {}
         self.param_spec.bind_async(loop, value=self.on_param_spec_value_changed)
 
-    @property
-    def is_14_bit(self) -> bool:
-        """True if the :attr:`map_obj` uses 14 bit values
+    @classmethod
+    def from_map_obj(
+        cls,
+        mapped_device: MappedDevice,
+        param_spec: BaseParameterSpec,
+        map_obj: Map
+    ) -> 'MappedParameter':
+        """Create an instance using the Midi numbers defined in the given
+        :class:`~.mapper.Map`
         """
-        return self.map_obj.is_14_bit
-
-    @property
-    def midi_max(self) -> int:
-        """Maximum value for MIDI data
+        return cls(mapped_device, param_spec, map_obj)
 
-        Will be 127 (``0x7f``) in most cases.  If :attr:`is_14_bit`, the value
-        will be 16383 (``0x3fff``).
+    def get_valid_messages(self, msgs: Iterable[mido.Message]) -> List[mido.Message]:
+        """Get the messages that should be handled by this object (as determined
+        by :meth:`message_valid`)
         """
-        if self.is_14_bit:
-            return 16383
-        return 0x7f
+        return [msg for msg in msgs if self.message_valid(msg)]
 
-    @property
-    def midi_range(self) -> int:
-        """Total range of MIDI values calculated as :attr:`midi_max` + 1
+    def get_dispatch_keys(self) -> List[DispatchKey]:
+        """Get the :data:`DispatchKeys <DispatchKey>` for all messages handled
+        by this object
         """
-        return self.midi_max + 1
-
-    @property
-    def value_range(self) -> Number:
-        r"""Total range of values calculated as
-
-        .. math::
+        raise NotImplementedError
 
-            V_{offset} &=
-                \begin{cases}
-                    1, & \quad \text{if }V_{min} = 0\\
-                    0, & \quad \text{if }V_{min}\ne 0
-                \end{cases}\\
-            V_{range} &= V_{max} - V_{min} + V_{offset}
+    async def handle_incoming_messages(self, msgs: Iterable[mido.Message]):
+        await self._handle_dispatched_messages(self.get_valid_messages(msgs))
 
-        where :math:`V_{min}` = :attr:`value_min` and
-        :math:`V_{max}` is :attr:`value_max`
-        """
-        r = self.value_max - self.value_min
-        if self.value_min == 0:
-            r += 1
-        return r
+    async def _handle_dispatched_messages(self, msgs: Sequence[mido.Message]):
+        # All messages are known to be valid for this object here.
+        # The controller state is now unknown, so the next value change
+        # must always be sent
+        self._last_midi_value = None
+        await self._handle_valid_messages(msgs)
 
-    async def handle_incoming_messages(self, msgs: Iterable[mido.Message]):
+    async def _handle_valid_messages(self, msgs: Sequence[mido.Message]):
         for msg in msgs:
-            if not self.message_valid(msg):
-                continue
             await self._handle_incoming_message(msg)
 
     async def _handle_incoming_message(self, msg: mido.messages.BaseMessage):
@@ -201,7 +266,8 @@ class MappedParameter(Dispatcher):
     def scale_to_midi(self, value: NumOrBool) -> int:
         r"""Scale the given value to the range allowed in midi messages
 
-        For boolean input, the result will be
+        For parameters using :class:`~.paramspec.BoolValue` or if the value
+        is a :class:`bool`, the result will be
 
         .. math::
 
@@ -211,7 +277,7 @@ class MappedParameter(Dispatcher):
                     0,       & \quad \text{otherwise}
                 \end{cases}
 
-        For numeric input
+        For all others
 
         .. math::
 
@@ -219,12 +285,23 @@ class MappedParameter(Dispatcher):
 
         where :math:`M_{max}` = :attr:`midi_max`, :math:`M_{range}` = :attr:`midi_range`,
         :math:`V_{min}` = :attr:`value_min` and :math:`V_{range}` = :attr:`value_range`
+
+        Numeric results are cached for up to :attr:`TO_MIDI_CACHE_SIZE` values,
+        discarding the oldest first
         """
-        m_max, m_range = self.midi_max, self.midi_range
-        if isinstance(value, bool):
-            return m_max if value else 0
-        r = (value - self.value_min) / self.value_range
-        return int(r * m_max)
+        if self._is_bool or value is True or value is False:
+            return self.midi_max if value else 0
+        # True and False hash the same as 1 and 0, so they must be handled
+        # above to keep them from sharing cache entries with numeric values
+        cache = self._to_midi_cache
+        result = cache.get(value)
+        if result is None:
+            # Divide last so the result matches the formula above exactly
+            result = int((value - self.value_min) * self.midi_max / self.value_range)
+            if len(cache) >= self.TO_MIDI_CACHE_SIZE:
+                del cache[next(iter(cache))]
+            cache[value] = result
+        return result
 
     def scale_from_midi(self, value: int) -> int:
         r"""Scale a value from the midi range to the :attr:`param_spec` range
@@ -235,10 +312,17 @@ class MappedParameter(Dispatcher):
 
         where :math:`M_{range}` = :attr:`midi_range`, :math:`V_{min}` = :attr:`value_min`
         and :math:`V_{range}` = :attr:`value_range`
+
+        For 7-bit parameters the results are precomputed for all possible
+        MIDI values
         """
-        m_max, m_range = self.midi_max, self.midi_range
-        r = value / m_range
-        return int(r * self.value_range + self.value_min)
+        lut = self._from_midi_lut
+        if lut is not None and 0 <= value <= 0x7f:
+            return lut[value]
+        return self._scale_from_midi(value)
+
+    def _scale_from_midi(self, value: int) -> int:
+        return int(value * self._from_midi_scale + self.value_min)
 
     def get_message_type(self, value: NumOrBool) -> str:
         """Get the :class:`mido.Message` type argument for an outgoing :class:`mido.Message`
@@ -271,12 +355,37 @@ class MappedParameter(Dispatcher):
         """
         return self.param_spec.get_param_value()
 
+    def build_current_messages(self) -> List[mido.Message]:
+        """Build the message(s) for the current device value
+
+        The value is recorded as the last one sent, so an identical change
+        that follows will not be sent again. If there is no current value,
+        an empty list is returned.
+
+        Used by :meth:`MappedDevice.get_all_parameter_messages`
+        """
+        value = self.get_current_value()
+        if value is None:
+            return []
+        self._last_midi_value = self.scale_to_midi(value)
+        msg = self.build_message(value)
+        if type(msg) is list:
+            return msg
+        return [msg]
+
     @logger.catch
     async def on_param_spec_value_changed(self, instance, value, **kwargs):
+        # Skip changes that quantize to the MIDI value last sent
+        midi_value = self.scale_to_midi(value)
+        if midi_value == self._last_midi_value:
+            return
+        self._last_midi_value = midi_value
+        await self._send_midi_value(value, midi_value)
+
+    async def _send_midi_value(self, value: NumOrBool, midi_value: int):
+        # Subclasses may build the message directly from midi_value
         msg = self.build_message(value)
         if self.is_14_bit:
-            assert isinstance(msg, list)
-            assert len(msg) == 2
             await self.mapped_device.send_messages(msg)
         else:
             await self.mapped_device.send_message(msg)
@@ -289,16 +398,32 @@ class MappedController(MappedParameter):
         controller (int): The controller number
 
     """
-    controller = None
-    value_min = 0
-    value_max = 1
+    __slots__ = ('controller', '_message_kwargs', '_message_template')
+
     def __init__(self, mapped_device: MappedDevice, param_spec: BaseParameterSpec, map_obj: Map, **kwargs):
         super().__init__(mapped_device, param_spec, map_obj, **kwargs)
         self.controller = kwargs['controller']
+        self._message_kwargs = {'channel':self.channel, 'control':self.controller}
+        self._message_template = mido.Message('control_change', **self._message_kwargs)
+
+    @classmethod
+    def from_map_obj(
+        cls,
+        mapped_device: MappedDevice,
+        param_spec: BaseParameterSpec,
+        map_obj: Map
+    ) -> 'MappedController':
+        return cls(mapped_device, param_spec, map_obj, controller=map_obj.controller)
+
+    def get_dispatch_keys(self) -> List[DispatchKey]:
+        return [('control_change', self.channel, self.controller)]
 
     async def _handle_incoming_message(self, msg: mido.Message):
         value = self.scale_from_midi(msg.value)
-        logger.debug(f'setting {self.param_spec.name} to {value} (msg.value={msg.value}), value_range={self.value_range}')
+        logger.debug(
+            'setting {} to {} (msg.value={}), value_range={}',
+            self.param_spec.name, value, msg.value, self.value_range,
+        )
         await self.param_group.set_param_value(self.param_spec.name, value)
 
     def message_valid(self, msg: mido.messages.BaseMessage) -> bool:
@@ -306,45 +431,61 @@ class MappedController(MappedParameter):
             return False
         if msg.control != self.controller:
             return False
-        return super().message_valid(msg)
+        return msg.channel == self.channel
 
     def get_message_type(self, value: NumOrBool) -> str:
         return 'control_change'
 
     def get_message_kwargs(self, value: NumOrBool) -> Dict:
-        kw = super().get_message_kwargs(value)
-        kw['control'] = self.controller
+        kw = self._message_kwargs.copy()
         kw['value'] = self.scale_to_midi(value)
         return kw
 
+    def build_message(self, value: NumOrBool) -> mido.Message:
+        return self._build_midi_message(self.scale_to_midi(value))
+
+    def _build_midi_message(self, midi_value: int) -> mido.Message:
+        # Copying a prebuilt message and setting its value only validates
+        # the value instead of every message argument
+        msg = self._message_template.copy()
+        msg.value = midi_value
+        return msg
+
+    async def _send_midi_value(self, value: NumOrBool, midi_value: int):
+        await self.mapped_device.send_message(self._build_midi_message(midi_value))
+
 class MappedController14Bit(MappedController):
     """A :class:`MappedController` using 14-bit Midi values
-    """
-
-    @property
-    def controller_msb(self) -> int:
-        """The controller index containing the most-significant 7 bits
 
-        This will always be equal to the :attr:`controller` value
-        """
-        return self.map_obj.controller_msb
+    Attributes:
+        controller_msb (int): The controller index containing the
+            most-significant 7 bits. This will always be equal to the
+            :attr:`controller` value
+        controller_lsb (int): The controller index containing the
+            least-significant 7 bits. Per the MIDI 1.0 specification, this
+            will be :attr:`controller_msb` + 32
 
-    @property
-    def controller_lsb(self) -> int:
-        """The controller index containing the least-significant 7 bits
+    """
+    __slots__ = ('controller_msb', 'controller_lsb', '_lsb_message_template')
 
-        Per the MIDI 1.0 specification, this will be :attr:`controller_msb` + 32
-        """
-        return self.map_obj.controller_lsb
+    def __init__(self, mapped_device: MappedDevice, param_spec: BaseParameterSpec, map_obj: Map, **kwargs):
+        super().__init__(mapped_device, param_spec, map_obj, **kwargs)
+        self.controller_msb = map_obj.controller_msb
+        self.controller_lsb = map_obj.controller_lsb
+        self._lsb_message_template = mido.Message(
+            'control_change', channel=self.channel, control=self.controller_lsb,
+        )
+
+    def get_dispatch_keys(self) -> List[DispatchKey]:
+        return [
+            ('control_change', self.channel, self.controller_msb),
+            ('control_change', self.channel, self.controller_lsb),
+        ]
 
-    async def handle_incoming_messages(self, msgs: Iterable[mido.Message]):
+    async def _handle_valid_messages(self, msgs: Sequence[mido.Message]):
         ctrl_lsb, ctrl_msb = self.controller_lsb, self.controller_msb
         msg_lsb, msg_msb = None, None
         for msg in msgs:
-            if msg.type != 'control_change':
-                continue
-            if msg.channel != self.channel:
-                continue
             if msg.control == ctrl_lsb:
                 msg_lsb = msg
             elif msg.control == ctrl_msb:
@@ -358,33 +499,28 @@ class MappedController14Bit(MappedController):
             value |= msg_lsb.value
         value = self.scale_from_midi(value)
         # logger.info(f'{self.param_spec.name}: {msg_msb=}, {msg_lsb=}, {value=}, {value_scaled=}')
-        logger.debug(f'setting {self.param_spec.name} to {value}')
+        logger.debug('setting {} to {}', self.param_spec.name, value)
         await self.param_group.set_param_value(self.param_spec.name, value)
 
     def message_valid(self, msg: mido.messages.BaseMessage) -> bool:
         if msg.type != 'control_change':
             return False
-        if msg.control != self.controller_lsb or msg.control != self.controller_msb:
+        if msg.control != self.controller_lsb and msg.control != self.controller_msb:
             return False
         return msg.channel == self.channel
 
     def build_message(self, value: NumOrBool) -> List[mido.Message]:
-        value = self.scale_to_midi(value)
-        msg_list = [
-            mido.Message(
-                'control_change',
-                channel=self.channel,
-                control=self.controller_msb,
-                value=value >> 7,
-            ),
-            mido.Message(
-                'control_change',
-                channel=self.channel,
-                control=self.controller_lsb,
-                value=value & 0x7f,
-            ),
-        ]
-        return msg_list
+        return self._build_midi_message(self.scale_to_midi(value))
+
+    def _build_midi_message(self, midi_value: int) -> List[mido.Message]:
+        msg_msb = self._message_template.copy()
+        msg_msb.value = midi_value >> 7
+        msg_lsb = self._lsb_message_template.copy()
+        msg_lsb.value = midi_value & 0x7f
+        return [msg_msb, msg_lsb]
+
+    async def _send_midi_value(self, value: NumOrBool, midi_value: int):
+        await self.mapped_device.send_messages(self._build_midi_message(midi_value))
 
 class MappedNoteParam(MappedParameter):
     """:class:`MappedParameter` subclass that uses midi note messages
@@ -399,11 +535,28 @@ class MappedNoteParam(MappedParameter):
         note (int): The midi note number
 
     """
-    note = None
+    __slots__ = ('note', '_message_kwargs', '_message_template')
 
     def __init__(self, mapped_device: MappedDevice, param_spec: BaseParameterSpec, map_obj: Map, **kwargs):
         super().__init__(mapped_device, param_spec, map_obj, **kwargs)
         self.note = kwargs['note']
+        self._message_kwargs = {'channel':self.channel, 'note':self.note}
+        self._message_template = mido.Message('note_on', **self._message_kwargs)
+
+    @classmethod
+    def from_map_obj(
+        cls,
+        mapped_device: MappedDevice,
+        param_spec: BaseParameterSpec,
+        map_obj: Map
+    ) -> 'MappedNoteParam':
+        return cls(mapped_device, param_spec, map_obj, note=map_obj.note)
+
+    def get_dispatch_keys(self) -> List[DispatchKey]:
+        return [
+            ('note_on', self.channel, self.note),
+            ('note_off', self.channel, self.note),
+        ]
 
     async def _handle_incoming_message(self, msg: mido.Message):
         if msg.type == 'note_on':
@@ -417,20 +570,30 @@ class MappedNoteParam(MappedParameter):
             return False
         if msg.note != self.note:
             return False
-        return super().message_valid(msg)
+        return msg.channel == self.channel
 
     def get_message_type(self, value: NumOrBool) -> str:
         return 'note_on'
 
     def get_message_kwargs(self, value: NumOrBool) -> Dict:
-        kw = super().get_message_kwargs(value)
-        kw['note'] = self.note
-        if not isinstance(value, bool):
-            v = self.scale_to_midi(value)
-            value = v == 127
-        kw['velocity'] = 127 if value else 0
+        kw = self._message_kwargs.copy()
+        kw['velocity'] = self._get_velocity(value)
         return kw
 
+    def build_message(self, value: NumOrBool) -> mido.Message:
+        msg = self._message_template.copy()
+        msg.velocity = self._get_velocity(value)
+        return msg
+
+    async def _send_midi_value(self, value: NumOrBool, midi_value: int):
+        # scale_to_midi gives 127 for True so this matches _get_velocity()
+        msg = self._message_template.copy()
+        msg.velocity = 127 if midi_value == 127 else 0
+        await self.mapped_device.send_message(msg)
+
+    def _get_velocity(self, value: NumOrBool) -> int:
+        return 127 if self.scale_to_midi(value) == 127 else 0
+
 class AdjustController(MappedController):
     """A :class:`MappedController` that sends outgoing messages like
     :class:`MappedController`, but incoming messages will either increment (>=64)
@@ -445,33 +608,19 @@ class AdjustController(MappedController):
     and :meth:`~jvconnected.device.ExposureParams.decrease_gain` methods.
 
     """
+    __slots__ = ()
+
     def __init__(self, mapped_device: MappedDevice, param_spec: BaseParameterSpec, map_obj: Map, **kwargs):
         super().__init__(mapped_device, param_spec, map_obj, **kwargs)
 
     async def _handle_incoming_message(self, msg: mido.Message):
         if msg.value >= 64:
-            logger.debug(f'incrementing {self.param_spec.name}')
+            logger.debug('incrementing {}', self.param_spec.name)
             await self.param_group.increment_param_value(self.param_spec.name)
         else:
-            logger.debug(f'decrementing {self.param_spec.name}')
+            logger.debug('decrementing {}', self.param_spec.name)
             await self.param_group.decrement_param_value(self.param_spec.name)
 
-    def message_valid(self, msg: mido.messages.BaseMessage) -> bool:
-        if msg.type != 'control_change':
-            return False
-        if msg.control != self.controller:
-            return False
-        return super().message_valid(msg)
-
-    def get_message_type(self, value: NumOrBool) -> str:
-        return 'control_change'
-
-    def get_message_kwargs(self, value: NumOrBool) -> Dict:
-        kw = super().get_message_kwargs(value)
-        kw['control'] = self.controller
-        kw['value'] = self.scale_to_midi(value)
-        return kw
-
 CONTROLLER_CLS = {
     'controller':MappedController,
     'controller/14':MappedController14Bit,
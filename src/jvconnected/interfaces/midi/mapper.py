@@ -1,13 +1,21 @@
-from loguru import logger
-
+import sys
+import bisect
 from typing import (
-    Any, Union, Dict, Sequence, Optional, ClassVar, Iterator, Tuple,
+    Any, Union, Dict, Sequence, Optional, ClassVar, Iterator, Tuple, Type,
 )
-import dataclasses
 from dataclasses import dataclass
 
+from jvconnected.utils import FlatDataclassMixin
+
+MAP_TYPES: Dict[str, Type['Map']] = {}
+"""Mapping of :attr:`Map.map_type` to its :class:`Map` subclass
+
+Subclasses are added automatically when they define their own
+:attr:`~Map.map_type`
+"""
+
 @dataclass
-class Map:
+class Map(FlatDataclassMixin):
     """Stores information for mapping MIDI messages to
     :class:`~jvconnected.interfaces.paramspec.ParameterGroupSpec` definitions
     """
@@ -45,31 +53,49 @@ class Map:
 
     def __post_init__(self):
         if not self.full_name:
-            self.full_name = '.'.join([self.group_name, self.name])
+            self.full_name = self.group_name + '.' + self.name
         else:
-            group_name, name = self.full_name.split('.')
+            group_name, sep, name = self.full_name.partition('.')
+            if not sep or '.' in name:
+                raise ValueError(f'Invalid full_name: "{self.full_name}"')
             if not self.group_name:
                 self.group_name = group_name
             if not self.name:
                 self.name = name
             assert self.group_name == group_name
             assert self.name == name
+        # Interned since these are used as dict keys by MidiMapper
+        self.full_name = sys.intern(self.full_name)
+        self.group_name = sys.intern(self.group_name)
+        self.name = sys.intern(self.name)
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if 'map_type' in cls.__dict__ and cls.map_type:
+            MAP_TYPES[cls.map_type] = cls
 
     @classmethod
     def get_class_for_map_type(cls, map_type: str) -> 'Map':
-        def iter_subcls(_cls):
-            if _cls is not Map:
-                yield _cls
-            for subcls in _cls.__subclasses__():
-                yield from iter_subcls(subcls)
-        for _cls in iter_subcls(Map):
-            if _cls.map_type == map_type:
-                return _cls
-        raise ValueError(f'No subclass found with map_type "{map_type}"')
+        """Get the :class:`Map` subclass for the given :attr:`map_type`
+        from :data:`MAP_TYPES`
+
+        Raises:
+            ValueError: If no subclass is found
+
+        """
+        try:
+            return MAP_TYPES[map_type]
+        except KeyError:
+            raise ValueError(f'No subclass found with map_type "{map_type}"')
 
 @dataclass
-class ControllerMap(Map):
+class ControllerMapBase(Map):
+    """Base class for maps using Midi control-change messages
+    """
     controller: int = 0 #: The Midi controller number for the mapping
+
+@dataclass
+class ControllerMap(ControllerMapBase):
     map_type: ClassVar[str] = 'controller'
 
 @dataclass
@@ -104,8 +130,7 @@ class NoteMap(Map):
     map_type: ClassVar[str] = 'note'
 
 @dataclass
-class AdjustControllerMap(Map):
-    controller: int = 0 #: The Midi controller number for the mapping
+class AdjustControllerMap(ControllerMapBase):
     map_type: ClassVar[str] = 'adjust_controller'
 
 
@@ -244,11 +269,27 @@ class MidiMapper:
         self.map = {}
         self.map_grouped = {}
         self.map_by_index = {}
+        self._next_index = 0
+        self._sorted_keys = []
+        self._sorted_indices = []
         if maps is None:
+            if _DEFAULT_MAPPER is not None:
+                self._copy_from(_DEFAULT_MAPPER)
+                return
             maps = DEFAULT_MAPPING
         for map_obj in maps:
             self.add_map(map_obj)
 
+    def _copy_from(self, other: 'MidiMapper'):
+        # The Map instances themselves are shared, as they are when
+        # DEFAULT_MAPPING is added directly
+        self.map = other.map.copy()
+        self.map_grouped = {k:v.copy() for k,v in other.map_grouped.items()}
+        self.map_by_index = other.map_by_index.copy()
+        self._next_index = other._next_index
+        self._sorted_keys = other._sorted_keys.copy()
+        self._sorted_indices = other._sorted_indices.copy()
+
     def add_map(self, map_obj: MapOrDict) -> Map:
         """Add or create a :class:`Map` definition
 
@@ -266,7 +307,10 @@ class MidiMapper:
         return map_obj
 
     def create_map(self, map_type: str, **kwargs) -> Map:
-        """Create a :class:`Map` with the given arguments and add it
+        """Create a :class:`Map` with the given arguments
+
+        The instance is not added. Use :meth:`add_map` or :meth:`add_map_obj`
+        for that.
 
         Arguments:
             map_type (str): The :attr:`~Map.map_type` of the :class:`Map`
@@ -275,18 +319,21 @@ class MidiMapper:
 
         """
         cls = Map.get_class_for_map_type(map_type)
-        kw = kwargs.copy()
-        obj = cls(**kw)
-        return obj
+        return cls(**kwargs)
 
     def add_map_obj(self, map_obj: Map):
         """Add an existing :class:`Map` instance
         """
         if map_obj.index == -1 or map_obj.index in self.map_by_index:
-            if not len(self):
-                map_obj.index = 0
-            else:
-                map_obj.index = max(self.map_by_index.keys()) + 1
+            map_obj.index = self._next_index
+        if map_obj.index >= self._next_index:
+            self._next_index = map_obj.index + 1
+        if map_obj.full_name not in self.map:
+            bisect.insort(
+                self._sorted_keys,
+                (map_obj.group_name, map_obj.name, map_obj.full_name),
+            )
+        bisect.insort(self._sorted_indices, map_obj.index)
         self.map[map_obj.full_name] = map_obj
         self.map_by_index[map_obj.index] = map_obj
         if map_obj.group_name not in self.map_grouped:
@@ -309,10 +356,8 @@ class MidiMapper:
         This will be sorted first by :attr:`~Map.group_name`, then by
         :attr:`~Map.name`
         """
-        for grp_key in sorted(self.map_grouped.keys()):
-            d = self.map_grouped[grp_key]
-            for key in sorted(d.keys()):
-                yield d[key].full_name
+        for _, _, full_name in self._sorted_keys:
+            yield full_name
 
     def values(self) -> Iterator[Map]:
         """Iterate over all stored instances, sorted as described in :meth:`keys`
@@ -329,7 +374,7 @@ class MidiMapper:
     def iter_indexed(self) -> Iterator[Map]:
         """Iterate over all stored instances, sorted by their :attr:`~Map.index`
         """
-        for ix in sorted(self.map_by_index.keys()):
+        for ix in self._sorted_indices:
             yield self.map_by_index[ix]
 
     def __iter__(self):
@@ -344,7 +389,11 @@ class MidiMapper:
     def serialize(self):
         d = {'maps':[]}
         for map_obj in self.values():
-            _d = dataclasses.asdict(map_obj)
+            _d = map_obj.as_dict()
             _d['map_type'] = map_obj.map_type
             d['maps'].append(_d)
         return d
+
+
+_DEFAULT_MAPPER: Optional[MidiMapper] = None
+_DEFAULT_MAPPER = MidiMapper()
@@ -2,7 +2,7 @@ from __future__ import annotations
 import typing as tp
 from loguru import logger
 import asyncio
-from typing import List, Dict, Sequence, Optional
+from typing import List, Dict, Sequence, Optional, Awaitable
 
 import mido
 import rtmidi
@@ -17,13 +17,21 @@ from jvconnected.interfaces.midi.mapper import MidiMapper
 class ValidationError(Exception):
     pass
 
+async def _await_all(coros: List[Awaitable]):
+    # Await the given coroutines concurrently, skipping the overhead of
+    # asyncio.gather when there are less than two
+    if len(coros) == 1:
+        await coros[0]
+    elif len(coros):
+        await asyncio.gather(*coros)
+
 class MidiIO(Interface):
     """Midi interface handler
     """
-    inport_names: tp.List[str] = ListProperty(copy_on_change=True)
+    inport_names: tp.List[str] = ListProperty()
     """list of input port names to use (as ``str``)"""
 
-    outport_names: tp.List[str] = ListProperty(copy_on_change=True)
+    outport_names: tp.List[str] = ListProperty()
     """list of output port names to use (as ``str``)"""
 
     inports: tp.Dict[str, InputPort] = DictProperty()
@@ -69,13 +77,19 @@ class MidiIO(Interface):
         self._port_lock = asyncio.Lock()
         self._refresh_event = asyncio.Event()
         self._refresh_task = None
+        self._mapped_devices_snapshot = ()
+        self._running_outports = ()
         self.mapper = MidiMapper()
         self.bind_async(
             self.loop,
             inport_names=self.on_inport_names,
             outport_names=self.on_outport_names,
         )
-        self.bind(config=self.read_config)
+        self.bind(
+            config=self.read_config,
+            mapped_devices=self._on_mapped_devices,
+            outports=self._update_running_outports,
+        )
 
     @classmethod
     def get_available_inputs(cls) -> List[str]:
@@ -100,7 +114,7 @@ class MidiIO(Interface):
         """Map the engine's devices by index
         """
         config = self.engine.config
-        coros = set()
+        coros = []
         config_update = False
         async with self._device_map_lock:
             for conf_device in config.indexed_devices.values():
@@ -117,14 +131,13 @@ class MidiIO(Interface):
                         config_update = True
                 elif mapped_device is None:
                     mapped_device = await self.map_device(device, send_all_parameters=False)
-                    coros.add(mapped_device.send_all_parameters())
+                    coros.append(mapped_device.send_all_parameters())
                     config_update = True
                 else:
                     assert device is mapped_device.device
             if config_update:
                 self.update_config()
-        if len(coros):
-            await asyncio.gather(*coros)
+        await _await_all(coros)
 
     @logger.catch
     async def open(self):
@@ -164,12 +177,12 @@ class MidiIO(Interface):
         """Close all running input and output ports
         (Called by :meth:`close`)
         """
-        coros = set()
+        coros = []
         for port in self.inports.values():
-            coros.add(port.close())
+            coros.append(port.close())
         for port in self.outports.values():
-            coros.add(port.close())
-        await asyncio.gather(*coros)
+            coros.append(port.close())
+        await _await_all(coros)
 
     async def add_input(self, name: str):
         """Add an input port
@@ -191,7 +204,7 @@ class MidiIO(Interface):
             if name in self.inports:
                 raise ValueError(f'Input "{name}" already open')
             port = InputPort(name)
-            logger.debug(f'port: {port}')
+            logger.debug('port: {}', port)
             self.inports[name] = port
             port.bind_async(self.loop, running=self.on_inport_running)
             if self.running:
@@ -224,7 +237,8 @@ class MidiIO(Interface):
                 if name in self.outports:
                     raise ValueError(f'Output "{name}" already open')
                 port = OutputPort(name)
-                logger.debug(f'port: {port}')
+                logger.debug('port: {}', port)
+                port.bind(running=self._update_running_outports)
                 self.outports[name] = port
                 try:
                     await port.open()
@@ -239,10 +253,9 @@ class MidiIO(Interface):
         port = self.inports[name]
         port.unbind(self)
         await port.close()
-        task = self._consume_tasks.get(name)
+        task = self._consume_tasks.pop(name, None)
         if task is not None:
             await task
-            del self._consume_tasks[name]
 
     async def remove_input(self, name: str):
         """Remove an input port from :attr:`inports` and :attr:`inport_names`
@@ -271,9 +284,10 @@ class MidiIO(Interface):
 
         """
         async with self._port_lock:
-            if name in self.outports:
-                port = self.outports[name]
+            port = self.outports.get(name)
+            if port is not None:
                 await port.close()
+                port.unbind(self)
                 del self.outports[name]
             if name in self.outport_names:
                 self.outport_names.remove(name)
@@ -288,27 +302,31 @@ class MidiIO(Interface):
                 r = False
             if r:
                 break
-            coros = set()
-            for mapped_device in self.mapped_devices.values():
-                coros.add(mapped_device.send_all_parameters())
-            if len(coros):
-                logger.debug('refreshing midi data')
-                await asyncio.gather(*coros)
+            if not len(self._mapped_devices_snapshot):
+                continue
+            logger.debug('refreshing midi data')
+            # Gather the messages for all devices to send them in one batch
+            msgs = []
+            for mapped_device in self._mapped_devices_snapshot:
+                try:
+                    msgs.extend(mapped_device.get_all_parameter_messages())
+                except Exception as exc:
+                    logger.exception(exc)
+            if len(msgs):
+                await self.send_messages(msgs)
 
     @logger.catch
     async def consume_incoming_messages(self, port: InputPort):
+        receive_many = port.receive_many
         while self.running and port.running:
-            msgs = await port.receive_many(timeout=.5)
+            msgs = await receive_many(timeout=.5)
             if msgs is None:
                 continue
-            logger.opt(lazy=True).debug(
-                '{x}', x=lambda: '\n'.join([f'MIDI rx: {msg}' for msg in msgs])
-            )
-            coros = set()
-            for device in self.mapped_devices.values():
-                coros.add(device.handle_incoming_messages(msgs))
-            if len(coros):
-                await asyncio.gather(*coros)
+            logger.debug('MIDI rx: {}', msgs)
+            # Incoming messages only queue commands on the devices, so they
+            # are handled one device after another
+            for device in self._mapped_devices_snapshot:
+                await device.handle_incoming_messages(msgs)
 
     async def send_message(self, msg: mido.messages.messages.BaseMessage):
         """Send a message to all output ports in :attr:`outports`
@@ -317,13 +335,10 @@ class MidiIO(Interface):
             msg: The :class:`Message <mido.Message>` to send
 
         """
-        coros = set()
-        for port in self.outports.values():
-            if port.running:
-                coros.add(port.send(msg))
+        coros = [port.send(msg) for port in self._running_outports]
         if len(coros):
-            await asyncio.gather(*coros)
-            logger.opt(lazy=True).debug(f'MIDI tx: {msg}')
+            await _await_all(coros)
+            logger.debug('MIDI tx: {}', msg)
 
     async def send_messages(self, msgs: Sequence[mido.Message]):
         """Send a message to all output ports in :attr:`outports`
@@ -332,15 +347,10 @@ class MidiIO(Interface):
             msgs: A sequence of :class:`Messages <mido.Message>` to send
 
         """
-        coros = set()
-        for port in self.outports.values():
-            if port.running:
-                coros.add(port.send_many(*msgs))
+        coros = [port.send_many(*msgs) for port in self._running_outports]
         if len(coros):
-            await asyncio.gather(*coros)
-            logger.opt(lazy=True).debug(
-                '{x}', x=lambda: '\n'.join([f'MIDI tx: {msg}' for msg in msgs])
-            )
+            await _await_all(coros)
+            logger.debug('MIDI tx: {}', msgs)
 
     @logger.catch
     async def map_device(
@@ -379,7 +389,7 @@ class MidiIO(Interface):
         await self._assign_device_channel(device_id, midi_channel)
         if send_all_parameters:
             await m.send_all_parameters()
-        logger.debug(f'mapped device: {m} to midi channel {midi_channel}')
+        logger.debug('mapped device: {} to midi channel {}', m, midi_channel)
         return m
 
     @logger.catch
@@ -395,7 +405,7 @@ class MidiIO(Interface):
                 from :attr:`mapped_devices`.
 
         """
-        logger.debug(f'unmap_device: {device_id}')
+        logger.debug('unmap_device: {}', device_id)
         async with self._device_map_lock:
             if device_id not in self.device_channel_map:
                 return
@@ -428,7 +438,7 @@ class MidiIO(Interface):
 
         """
         mapped_device = self.mapped_devices.get(device_id)
-        logger.debug(f'remap_device: {device_id}, {midi_channel}, {mapped_device}')
+        logger.debug('remap_device: {}, {}, {}', device_id, midi_channel, mapped_device)
         if mapped_device is not None:
             if mapped_device.midi_channel == midi_channel:
                 return
@@ -500,9 +510,12 @@ class MidiIO(Interface):
         d = self.get_config_section()
         if d is None:
             return
-        d['inport_names'] = self.inport_names.copy()
-        d['outport_names'] = self.outport_names.copy()
-        d['device_channel_map'] = self.device_channel_map.copy()
+        # Each item assignment makes the config write its file, so only
+        # assign values that differ
+        for attr in ['inport_names', 'outport_names', 'device_channel_map']:
+            prop_val = getattr(self, attr)
+            if d.get(attr) != prop_val:
+                d[attr] = prop_val.copy()
 
     def read_config(self, *args, **kwargs):
         d = self.get_config_section()
@@ -553,19 +566,31 @@ class MidiIO(Interface):
         #         await self.add_output(name)
         # self.update_config()
 
+    def _on_mapped_devices(self, instance, value, **kwargs):
+        # Kept as a tuple for the loops in periodic_refresh and
+        # consume_incoming_messages, which may await while devices are
+        # mapped or unmapped
+        self._mapped_devices_snapshot = tuple(value.values())
+
+    def _update_running_outports(self, *args, **kwargs):
+        # Called when outports changes or any of them start or stop, so the
+        # send methods don't need to check each port
+        self._running_outports = tuple(
+            port for port in self.outports.values() if port.running
+        )
+
     async def on_inport_running(self, port, value, **kwargs):
-        logger.debug(f'{self}.on_inport_running({port}, {value})')
+        logger.debug('{}.on_inport_running({}, {})', self, port, value)
         if port is not self.inports.get(port.name):
             return
         if value:
-            logger.debug(f'starting consume task for {port}')
+            logger.debug('starting consume task for {}', port)
             assert port.name not in self._consume_tasks
             task = asyncio.ensure_future(self.consume_incoming_messages(port))
             self._consume_tasks[port.name] = task
-            logger.debug(f'consume task running for {port}')
+            logger.debug('consume task running for {}', port)
         else:
-            logger.debug(f'stopping consume task for {port}')
-            task = self._consume_tasks.get(port.name)
+            logger.debug('stopping consume task for {}', port)
+            task = self._consume_tasks.pop(port.name, None)
             if task is not None:
                 await task
-                del self._consume_tasks[port.name]
@@ -3,8 +3,9 @@ import functools
 import enum
 import asyncio
 import collections
+import dataclasses
 from dataclasses import dataclass
-from typing import Any, Iterator, Union, Tuple
+from typing import Any, Iterator, Union, Tuple, Dict
 
 from pydispatch import Dispatcher
 
@@ -295,6 +296,33 @@ class IndexedDict(Dispatcher):
             key=key, item=item, old_index=cur_index, new_index=new_index,
         )
 
+class FlatDataclassMixin:
+    """Mixin for :func:`dataclasses <dataclasses.dataclass>` whose fields
+    are all flat values
+
+    Adds a cached :meth:`get_field_names` lookup and an :meth:`as_dict` method
+    """
+
+    @classmethod
+    def get_field_names(cls) -> Tuple[str, ...]:
+        """Get the names of all dataclass fields for the class
+
+        The result is computed once per class and cached
+        """
+        names = cls.__dict__.get('_field_names')
+        if names is None:
+            names = tuple(f.name for f in dataclasses.fields(cls))
+            cls._field_names = names
+        return names
+
+    def as_dict(self) -> Dict:
+        """Get the field values as a :class:`dict`
+
+        Since all fields are flat values, this is a faster alternative to
+        :func:`dataclasses.asdict`
+        """
+        return {name:getattr(self, name) for name in self.get_field_names()}
+
 @dataclass
 class NamedItem:
     """Helper class for :class:`NamedQueue`
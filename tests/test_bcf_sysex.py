@@ -0,0 +1,104 @@
+import pytest
+import mido
+import dataclasses
+from jvconnected.interfaces.midi import bcf_sysex
+from jvconnected.interfaces.midi.bcf import build_preset
+
+
+def test_sysex_roundtrip():
+    pst = build_preset()
+    blk = pst.build_bcl_block()
+    items = blk.build_sysex_items()
+    assert len(items) == len(blk.text_lines) + 2
+
+    for i, item in enumerate(items):
+        assert item.message_index == i
+        msg = item.build_sysex_message()
+        parsed = bcf_sysex.BCLSysex.from_sysex_message(msg)
+        assert parsed == item
+        assert parsed.message_index == item.message_index
+
+
+def test_reply_roundtrip():
+    reply = bcf_sysex.BCLReply(message_index=300)
+    parsed = bcf_sysex.BCLReply.from_sysex_message(reply.build_sysex_message())
+    assert parsed == reply
+    parsed.raise_on_error()
+
+    reply = bcf_sysex.BCLReply(message_index=2, error_code=4)
+    parsed = bcf_sysex.BCLReply.from_sysex_message(reply.build_sysex_message())
+    assert parsed.error_code == 4
+    with pytest.raises(bcf_sysex.ResponseError):
+        parsed.raise_on_error()
+
+
+def test_block_from_messages():
+    pst = build_preset()
+    blk = pst.build_bcl_block()
+    other = [
+        mido.Message('note_on', note=1),
+        bcf_sysex.BCLSysex(bcl_text='$foo').build_sysex_message(),
+    ]
+    msgs = other + blk.build_sysex_messages() + other
+    parsed, unhandled = bcf_sysex.BCLBlock.from_midi_messages(msgs)
+    assert parsed == blk
+    assert unhandled == other + other
+
+    # Foreign sysex, short sysex and replies within the block are skipped
+    body = blk.build_sysex_messages()
+    foreign = [
+        mido.Message('sysex', data=b'\x00\x20\x33\x7f\x14\x20\x00\x01foo'),
+        mido.Message('sysex', data=b'\x7d\x01'),
+        bcf_sysex.BCLReply(message_index=1).build_sysex_message(),
+    ]
+    msgs = body[:2] + foreign + body[2:]
+    parsed, unhandled = bcf_sysex.BCLBlock.from_midi_messages(msgs)
+    assert parsed == blk
+    assert unhandled == foreign
+
+    msgs = blk.build_sysex_messages()
+    del msgs[2]
+    with pytest.raises(ValueError):
+        bcf_sysex.BCLBlock.from_midi_messages(msgs)
+
+
+def test_preset_as_dict():
+    pst = build_preset()
+    d = pst.as_dict()
+    for key in ['encoders', 'faders', 'buttons']:
+        controls = getattr(pst, key).values()
+        assert d[key] == [dataclasses.asdict(obj) for obj in controls]
+
+    pst2 = bcf_sysex.Preset(**d)
+    assert pst2.as_dict() == d
+    assert pst2.build_bcl_lines() == pst.build_bcl_lines()
+
+
+def test_block_sysex_data():
+    blk = bcf_sysex.BCLBlock(text_lines=[f'line {i}' for i in range(300)])
+    items = blk.build_sysex_items()
+    data = blk.build_sysex_data()
+    assert data == [item.build_sysex_data() for item in items]
+    assert items[-1].message_index > 0x7f
+
+    frames = blk.build_sysex_bytes()
+    assert frames == [msg.bin() for msg in blk.build_sysex_messages()]
+
+
+def test_preset_cache():
+    pst = build_preset()
+    msgs = pst.build_sysex_messages()
+    expected = [msg.bin() for msg in msgs]
+    msgs[0].data = (0, 0, 0)
+    msgs.clear()
+    assert [msg.bin() for msg in pst.build_sysex_messages()] == expected
+
+    lines = pst.build_bcl_lines()
+    ix, fader = next(iter(pst.faders.items()))
+    pst.faders[ix] = dataclasses.replace(fader, number=fader.number + 1)
+    assert pst.build_bcl_lines() != lines
+    assert [msg.bin() for msg in pst.build_sysex_messages()] != expected
+
+    lines = pst.build_bcl_lines()
+    del pst.encoders[next(iter(pst.encoders))]
+    assert len(pst.build_bcl_lines()) < len(lines)
@@ -0,0 +1,348 @@
+import asyncio
+
+import pytest
+import mido
+from pydispatch import Dispatcher, Property
+
+from jvconnected.interfaces import paramspec
+from jvconnected.interfaces.midi import mapper
+from jvconnected.interfaces.midi.mapped_device import (
+    MappedDevice, MappedController, MappedController14Bit, MappedNoteParam,
+)
+
+class FakeParamGroup(Dispatcher):
+    def __init__(self):
+        self.calls = []
+
+class FakeExposureParams(FakeParamGroup):
+    mode = Property()
+    iris_mode = Property()
+    iris_pos = Property(0)
+    gain_mode = Property()
+    gain_pos = Property(0)
+    shutter_mode = Property()
+    master_black_pos = Property(0)
+
+    async def set_iris_pos(self, value):
+        self.calls.append(('set_iris_pos', value))
+        self.iris_pos = value
+
+    async def adjust_gain(self, direction):
+        self.calls.append(('adjust_gain', direction))
+        self.gain_pos += 1 if direction else -1
+
+    async def adjust_master_black(self, direction):
+        self.calls.append(('adjust_master_black', direction))
+        self.master_black_pos += 1 if direction else -1
+
+class FakePaintParams(FakeParamGroup):
+    white_balance_mode = Property()
+    red_normalized = Property(0)
+    blue_normalized = Property(0)
+    detail_pos = Property(0)
+
+    async def set_red_pos(self, value):
+        self.calls.append(('set_red_pos', value))
+        self.red_normalized = value
+
+    async def set_blue_pos(self, value):
+        self.calls.append(('set_blue_pos', value))
+        self.blue_normalized = value
+
+    async def adjust_detail(self, direction):
+        self.calls.append(('adjust_detail', direction))
+        self.detail_pos += 1 if direction else -1
+
+class FakeTallyParams(FakeParamGroup):
+    program = Property(False)
+    preview = Property(False)
+    tally_status = Property()
+
+    async def set_program(self, value):
+        self.calls.append(('set_program', value))
+        self.program = value
+
+    async def set_preview(self, value):
+        self.calls.append(('set_preview', value))
+        self.preview = value
+
+class FakeFooParams(FakeParamGroup):
+    foo = Property(0)
+
+class FakeGroupSpec:
+    """Stands in for a ParameterGroupSpec with a single "foo" parameter
+    """
+    def __init__(self):
+        self.device_param_group = FakeFooParams()
+        self.calls = []
+
+    async def set_param_value(self, name, value):
+        # Like a real device, the value isn't updated until it reports back
+        self.calls.append((name, value))
+
+class FakeDevice:
+    def __init__(self):
+        self.parameter_groups = {
+            'exposure':FakeExposureParams(),
+            'paint':FakePaintParams(),
+            'tally':FakeTallyParams(),
+        }
+
+    def all_calls(self):
+        return {name:pg.calls for name, pg in self.parameter_groups.items()}
+
+class FakeMidiIO:
+    def __init__(self):
+        self.sent = []
+
+    async def send_message(self, msg):
+        self.sent.append(msg)
+
+    async def send_messages(self, msgs):
+        self.sent.extend(msgs)
+
+async def wait_for_callbacks():
+    # Let any bind_async callbacks run
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+def build_mapped_device(midi_channel=2):
+    device = FakeDevice()
+    midi_io = FakeMidiIO()
+    mapped_device = MappedDevice(midi_io, midi_channel, device, mapper.MidiMapper())
+    return mapped_device, device, midi_io
+
+@pytest.mark.asyncio
+async def test_scale_to_midi_range():
+    mapped_device, device, midi_io = build_mapped_device()
+    # Ranges starting at zero use a value_range of one more than their span,
+    # so only nonzero minimums reach midi_max here
+    ranges = [(-60, 1), (-6, 24), (-50, 50), (-32, 32), (-10, 10), (1, 100), (-1, 0)]
+    for value_min, value_max in ranges:
+        for map_cls in [mapper.ControllerMap, mapper.Controller14BitMap]:
+            spec = paramspec.ParameterSpec(
+                name='foo',
+                value_type=paramspec.IntValue(value_min=value_min, value_max=value_max),
+            )
+            map_obj = map_cls(group_name='paint', name='foo', controller=1)
+            cls = MappedController14Bit if map_obj.is_14_bit else MappedController
+            mapped_param = cls.from_map_obj(mapped_device, spec, map_obj)
+            assert mapped_param.scale_to_midi(value_min) == 0
+            assert mapped_param.scale_to_midi(value_max) == mapped_param.midi_max
+            results = [
+                mapped_param.scale_to_midi(v) for v in range(value_min, value_max+1)
+            ]
+            assert results == sorted(results)
+
+    spec = paramspec.ParameterSpec(name='foo', value_type=paramspec.BoolValue())
+    map_obj = mapper.NoteMap(group_name='tally', name='foo', note=1)
+    mapped_param = MappedNoteParam.from_map_obj(mapped_device, spec, map_obj)
+    assert mapped_param.scale_to_midi(False) == 0
+    assert mapped_param.scale_to_midi(True) == 127
+
+@pytest.mark.asyncio
+async def test_incoming_messages():
+    ch = 2
+    mapped_device, device, midi_io = build_mapped_device(ch)
+    exposure = device.parameter_groups['exposure']
+    paint = device.parameter_groups['paint']
+    tally = device.parameter_groups['tally']
+    params = mapped_device.mapped_params
+
+    ignored = [
+        mido.Message('control_change', channel=ch+1, control=3, value=100),
+        mido.Message('control_change', channel=ch, control=20, value=100),
+        mido.Message('note_on', channel=ch, note=1, velocity=127),
+        mido.Message('note_on', channel=ch+1, note=127, velocity=127),
+        mido.Message('pitchwheel', channel=ch, pitch=100),
+        mido.Message('sysex', data=[1, 2, 3]),
+    ]
+    await mapped_device.handle_incoming_messages(ignored)
+    await wait_for_callbacks()
+    assert device.all_calls() == {'exposure':[], 'paint':[], 'tally':[]}
+
+    red = params['paint.red_normalized']
+    await mapped_device.handle_incoming_messages([
+        mido.Message('control_change', channel=ch, control=3, value=100),
+    ])
+    assert paint.calls == [('set_red_pos', red.scale_from_midi(100))]
+    assert paint.red_normalized == red.scale_from_midi(100)
+    paint.calls.clear()
+
+    iris = params['exposure.iris_pos']
+    await mapped_device.handle_incoming_messages([
+        mido.Message('control_change', channel=ch, control=0, value=0x55),
+        mido.Message('control_change', channel=ch, control=32, value=0x2a),
+    ])
+    assert exposure.calls == [('set_iris_pos', iris.scale_from_midi(0x55 << 7 | 0x2a))]
+    exposure.calls.clear()
+
+    await mapped_device.handle_incoming_messages([
+        mido.Message('note_on', channel=ch, note=127, velocity=127),
+    ])
+    assert tally.calls == [('set_program', True)]
+    await mapped_device.handle_incoming_messages([
+        mido.Message('note_off', channel=ch, note=127),
+        mido.Message('note_on', channel=ch, note=126, velocity=0),
+    ])
+    assert tally.calls == [('set_program', True), ('set_program', False), ('set_preview', False)]
+    tally.calls.clear()
+
+    await mapped_device.handle_incoming_messages([
+        mido.Message('control_change', channel=ch, control=2, value=65),
+        mido.Message('control_change', channel=ch, control=2, value=10),
+    ])
+    assert exposure.calls == [('adjust_gain', True), ('adjust_gain', False)]
+    exposure.calls.clear()
+
+    # A single batch with matching and unmatched messages mixed together
+    msgs = [
+        mido.Message('control_change', channel=ch, control=4, value=0),
+        mido.Message('note_on', channel=ch, note=126, velocity=127),
+    ] + ignored + [
+        mido.Message('control_change', channel=ch, control=5, value=127),
+    ]
+    await mapped_device.handle_incoming_messages(msgs)
+    await wait_for_callbacks()
+    blue = params['paint.blue_normalized']
+    assert device.all_calls() == {
+        'exposure':[],
+        'paint':[('set_blue_pos', blue.scale_from_midi(0)), ('adjust_detail', True)],
+        'tally':[('set_preview', True)],
+    }
+
+@pytest.mark.asyncio
+async def test_outgoing_dedupe():
+    ch = 2
+    mapped_device, device, midi_io = build_mapped_device(ch)
+    group_spec = FakeGroupSpec()
+    pg = group_spec.device_param_group
+    spec = paramspec.ParameterSpec(
+        name='foo', full_name='paint.foo',
+        value_type=paramspec.IntValue(value_min=-300, value_max=300),
+    )
+    spec.param_group_spec = group_spec
+    map_obj = mapper.ControllerMap(group_name='paint', name='foo', controller=10)
+    mapped_param = MappedController.from_map_obj(mapped_device, spec, map_obj)
+    mapped_device.mapped_params[mapped_param.name] = mapped_param
+
+    # 0 and 1 both scale to 63, 10 and 11 to 65
+    assert mapped_param.scale_to_midi(0) == mapped_param.scale_to_midi(1) == 63
+    assert mapped_param.scale_to_midi(10) == mapped_param.scale_to_midi(11) == 65
+
+    def get_sent_values():
+        return [
+            msg.value for msg in midi_io.sent
+            if msg.type == 'control_change' and msg.control == 10
+        ]
+
+    pg.foo = 1
+    await wait_for_callbacks()
+    assert get_sent_values() == [63]
+
+    # Same MIDI value as last sent
+    pg.foo = 0
+    await wait_for_callbacks()
+    assert get_sent_values() == [63]
+
+    pg.foo = 10
+    await wait_for_callbacks()
+    assert get_sent_values() == [63, 65]
+
+    # An incoming message means the controller may no longer be at the
+    # last value sent, so the next one must be sent even if it matches
+    await mapped_param.handle_incoming_messages([
+        mido.Message('control_change', channel=ch, control=10, value=100),
+    ])
+    assert group_spec.calls == [('foo', mapped_param.scale_from_midi(100))]
+    pg.foo = 11
+    await wait_for_callbacks()
+    assert get_sent_values() == [63, 65, 65]
+
+    # A full refresh after an incoming message sends the current value (11)
+    # and primes the dedupe with it
+    await mapped_param.handle_incoming_messages([
+        mido.Message('control_change', channel=ch, control=10, value=100),
+    ])
+    midi_io.sent.clear()
+    await mapped_device.send_all_parameters()
+    assert get_sent_values() == [65]
+    pg.foo = 10
+    await wait_for_callbacks()
+    assert get_sent_values() == [65]
+
+@pytest.mark.asyncio
+async def test_14_bit_message_valid():
+    ch = 2
+    mapped_device, device, midi_io = build_mapped_device(ch)
+    exposure = device.parameter_groups['exposure']
+    iris = mapped_device.mapped_params['exposure.iris_pos']
+    assert isinstance(iris, MappedController14Bit)
+    assert (iris.controller_msb, iris.controller_lsb) == (0, 32)
+
+    valid = [
+        mido.Message('control_change', channel=ch, control=0, value=0x40),
+        mido.Message('control_change', channel=ch, control=32, value=0x10),
+    ]
+    assert [iris.message_valid(msg) for msg in valid] == [True, True]
+
+    invalid = [
+        mido.Message('control_change', channel=ch, control=1, value=0x40),
+        mido.Message('control_change', channel=ch, control=33, value=0x10),
+    ]
+    assert [iris.message_valid(msg) for msg in invalid] == [False, False]
+    wrong_channel = [msg.copy(channel=ch+1) for msg in valid]
+    assert [iris.message_valid(msg) for msg in wrong_channel] == [False, False]
+
+    await iris.handle_incoming_messages(invalid + wrong_channel)
+    assert exposure.calls == []
+    await iris.handle_incoming_messages(invalid + valid)
+    assert exposure.calls == [('set_iris_pos', iris.scale_from_midi(0x40 << 7 | 0x10))]
+    await wait_for_callbacks()
+
+@pytest.mark.asyncio
+async def test_scale_to_midi_bool():
+    mapped_device, device, midi_io = build_mapped_device()
+    spec = paramspec.ParameterSpec(name='foo', value_type=paramspec.BoolValue())
+    map_obj = mapper.ControllerMap(group_name='tally', name='foo', controller=1)
+    mapped_param = MappedController.from_map_obj(mapped_device, spec, map_obj)
+    # Any truthy value gives midi_max for BoolValue parameters
+    assert [mapped_param.scale_to_midi(v) for v in [False, True, 0, 1, 5]] == [0, 127, 0, 127, 127]
+
+    # bool values give 0 or midi_max for numeric parameters
+    for map_cls in [mapper.ControllerMap, mapper.Controller14BitMap]:
+        spec = paramspec.ParameterSpec(
+            name='foo', value_type=paramspec.IntValue(value_min=-10, value_max=10),
+        )
+        map_obj = map_cls(group_name='paint', name='foo', controller=1)
+        cls = MappedController14Bit if map_obj.is_14_bit else MappedController
+        mapped_param = cls.from_map_obj(mapped_device, spec, map_obj)
+        assert mapped_param.scale_to_midi(False) == 0
+        assert mapped_param.scale_to_midi(True) == mapped_param.midi_max
+
+@pytest.mark.asyncio
+async def test_scale_to_midi_cache():
+    mapped_device, device, midi_io = build_mapped_device()
+    spec = paramspec.ParameterSpec(
+        name='foo', value_type=paramspec.IntValue(value_min=-10, value_max=10),
+    )
+    map_obj = mapper.ControllerMap(group_name='paint', name='foo', controller=1)
+    mapped_param = MappedController.from_map_obj(mapped_device, spec, map_obj)
+    expected = {v:int((v + 10) * 127 / 20) for v in range(-10, 11)}
+
+    # bool and int results must not depend on which was cached first
+    assert mapped_param.scale_to_midi(1) == expected[1]
+    assert mapped_param.scale_to_midi(True) == 127
+    assert mapped_param.scale_to_midi(False) == 0
+    assert mapped_param.scale_to_midi(0) == expected[0]
+    assert mapped_param.scale_to_midi(1) == expected[1]
+
+    # Results stay correct once the oldest entries are discarded
+    size = mapped_param.TO_MIDI_CACHE_SIZE
+    for _ in range(size // len(expected) + 2):
+        for v, midi_value in expected.items():
+            assert mapped_param.scale_to_midi(v) == midi_value
+    for v in range(size * 2):
+        mapped_param.scale_to_midi(v)
+    assert len(mapped_param._to_midi_cache) == size
+    assert [mapped_param.scale_to_midi(v) for v in expected] == list(expected.values())
@@ -64,3 +64,23 @@ def test_mapper(replacement_maps):
     for m_def in replacement_maps:
         full_name = '.'.join([m_def.group_name, m_def.name])
         assert m_def == replacement_map[full_name] == replacement_map.get(full_name)
+
+def test_serialize():
+    default_map = mapper.MidiMapper()
+    serialized = default_map.serialize()
+    assert len(serialized['maps']) == len(default_map)
+    for m, d in zip(default_map.values(), serialized['maps']):
+        expected = dataclasses.asdict(m)
+        expected['map_type'] = m.map_type
+        assert d == expected
+
+def test_add_map_dicts():
+    maps = mapper.MidiMapper().serialize()['maps']
+    for d in maps:
+        d['index'] = -1
+    dict_map = mapper.MidiMapper(maps)
+    assert len(dict_map) == len(dict_map.map_by_index) == len(maps)
+    assert sorted(dict_map.map_by_index.keys()) == list(range(len(maps)))
+    for ix, m in dict_map.map_by_index.items():
+        assert m.index == ix
+        assert dict_map[m.full_name] is m